@@ -1,7 +1,7 @@
 # bank_teller_sim.py
 """
-Bank Teller Simulation using SimPy
-----------------------------------
+Bank Teller Simulation
+----------------------
 This program simulates how customers are served at a bank with a few tellers.
 Customers arrive randomly, wait in a single line, and get served by the first available teller.
 The program tracks the average wait time, teller utilization, and other stats.
@@ -12,134 +12,153 @@ Example:
     python bank_teller_sim.py --lam 10 --mu 12 --tellers 2 --hours 8 --runs 10
 """
 
-import simpy
-import random
-import statistics
 import argparse
+import heapq
+import numpy as np
 
 # ------------------------------------------------------
-# Helper function for exponential times (arrivals & service)
+# Helper for exponential times (arrivals & service)
 # ------------------------------------------------------
-def expovariate_from_rate_per_hour(rate_per_hour):
-    """Return an exponential random value in minutes based on a rate per hour."""
-    if rate_per_hour <= 0:
-        raise ValueError("Rate must be positive.")
-    rate_per_minute = rate_per_hour / 60.0
-    return random.expovariate(rate_per_minute)
+class ExpSampler:
+    """Hands out exponential random times in minutes for a rate per hour.
+
+    Variates are drawn from numpy in batches so the per-call cost is one
+    array index instead of one pure-Python expovariate call. PCG64 also
+    generates roughly twice as fast per draw as the stdlib's MT19937.
+    """
+    BATCH = 65536
+
+    def __init__(self, rate_per_hour, rng):
+        if rate_per_hour <= 0:
+            raise ValueError("Rate must be positive.")
+        self.scale = 60.0 / rate_per_hour   # mean time in minutes
+        self.rng = rng
+        self._buf = np.empty(0)             # filled on first draw
+        self._i = 0
+
+    def next(self):
+        if self._i >= self._buf.size:
+            self._buf = self.rng.exponential(self.scale, self.BATCH)
+            self._i = 0
+        value = self._buf[self._i]
+        self._i += 1
+        return value
 
 # ------------------------------------------------------
 # Data collector for recording simulation results
 # ------------------------------------------------------
 class Stats:
-    def __init__(self):
-        self.wait_times = []        # how long each customer waits
-        self.service_times = []     # how long service takes
-        self.system_times = []      # total time in system (wait + service)
+    def __init__(self, n_upper=4096):
+        # preallocated arrays written by index; Python lists would box
+        # every float and churn the allocator on long runs
+        self.wait_times = np.empty(n_upper)     # how long each customer waits
+        self.service_times = np.empty(n_upper)  # how long service takes
+        self.system_times = np.empty(n_upper)   # total time in system (wait + service)
+        self.n_started = 0          # customers that reached a teller
+        self.n_completed = 0        # customers that finished service
         self.area_q = 0.0           # used to calculate average queue length
-        self.last_time = 0.0
         self.teller_busy_time = 0.0 # total time tellers are busy
         self.total_teller_time = 0.0
 
-    def update_queue_area(self, env, q_length):
-        """Update area under the queue length curve."""
-        dt = env.now - self.last_time
-        self.area_q += q_length * dt
-        self.last_time = env.now
-
-# ------------------------------------------------------
-# Teller resource with utilization tracking
-# ------------------------------------------------------
-class TellerPool:
-    def __init__(self, env, num_tellers, stats):
-        self.env = env
-        self.resource = simpy.Resource(env, capacity=num_tellers)
-        self.stats = stats
+    def record_service_start(self, wait, service):
+        i = self.n_started
+        if i == self.wait_times.size:
+            self.wait_times = np.concatenate([self.wait_times, np.empty(i)])
+            self.service_times = np.concatenate([self.service_times, np.empty(i)])
+        self.wait_times[i] = wait
+        self.service_times[i] = service
+        self.n_started = i + 1
+
+    def record_completion(self, system_time):
+        i = self.n_completed
+        if i == self.system_times.size:
+            self.system_times = np.concatenate([self.system_times, np.empty(i)])
+        self.system_times[i] = system_time
+        self.n_completed = i + 1
+
+# ------------------------------------------------------
+# Teller pool: a heap of free-times instead of simpy.Resource
+# ------------------------------------------------------
+class FastTellers:
+    """Minimal FCFS multi-server pool.
+
+    Service is always first-come-first-served and the service time is
+    drawn on arrival, so each customer's wait follows directly from the
+    earliest teller free-time — no resource bookkeeping needed.
+    """
+    def __init__(self, num_tellers):
         self.num_tellers = num_tellers
-        self._busy = 0
-        self._last_change = env.now
-        self._monitor = env.process(self._track_utilization())
-
-    def request(self):
-        return self.resource.request()
-
-    def release(self, req):
-        return self.resource.release(req)
-
-    def _track_utilization(self):
-        """Keeps track of how many tellers are busy over time."""
-        while True:
-            current_busy = len(self.resource.users)
-            if current_busy != self._busy:
-                dt = self.env.now - self._last_change
-                self.stats.teller_busy_time += self._busy * dt
-                self._busy = current_busy
-                self._last_change = self.env.now
-            yield self.env.timeout(0.1)  # small delay for updates
+        self.free_times = [0.0] * num_tellers
+        heapq.heapify(self.free_times)
+        self.committed_time = 0.0   # total service time handed out
 
-# ------------------------------------------------------
-# Customer process
-# ------------------------------------------------------
-def customer(env, name, tellers, stats, mu_per_hour):
-    arrival_time = env.now
-    stats.update_queue_area(env, len(tellers.resource.queue))
-
-    # Wait for teller
-    with tellers.request() as req:
-        yield req
-        start_service = env.now
-        wait = start_service - arrival_time
-        stats.wait_times.append(wait)
-
-        # Service time
-        service_time = expovariate_from_rate_per_hour(mu_per_hour)
-        stats.service_times.append(service_time)
-        yield env.timeout(service_time)
-
-        finish_time = env.now
-        stats.system_times.append(finish_time - arrival_time)
-        stats.update_queue_area(env, len(tellers.resource.queue))
+    def acquire(self, now, service_time):
+        """Claim the earliest-free teller at time `now`; returns the wait."""
+        earliest = self.free_times[0]
+        wait = earliest - now if earliest > now else 0.0
+        heapq.heapreplace(self.free_times, now + wait + service_time)
+        self.committed_time += service_time
+        return wait
 
-# ------------------------------------------------------
-# Customer arrival generator
-# ------------------------------------------------------
-def arrival_process(env, tellers, stats, lam_per_hour, mu_per_hour, sim_minutes):
-    i = 0
-    while env.now < sim_minutes:
-        interarrival = expovariate_from_rate_per_hour(lam_per_hour)
-        yield env.timeout(interarrival)
-        i += 1
-        env.process(customer(env, f"Customer_{i}", tellers, stats, mu_per_hour))
+    def busy_time(self, until):
+        """Teller-minutes of work done by time `until`.
+
+        Work on each teller runs back-to-back up to its free-time, so the
+        part past `until` is just the tail beyond the horizon.
+        """
+        overshoot = sum(f - until for f in self.free_times if f > until)
+        return self.committed_time - overshoot
 
 # ------------------------------------------------------
 # Run one replication
 # ------------------------------------------------------
 def run_replication(lam_per_hour=10, mu_per_hour=12, tellers=2, hours=8, seed=None):
-    if seed is not None:
-        random.seed(seed)
-    env = simpy.Environment()
-    stats = Stats()
-    teller_pool = TellerPool(env, tellers, stats)
+    # per-replication generator; nothing touches process-global RNG state
+    rng = np.random.Generator(np.random.PCG64(seed))
+    n_upper = int(1.5 * lam_per_hour * hours) + 128
+    stats = Stats(n_upper)
+    teller_pool = FastTellers(tellers)
     sim_minutes = hours * 60
 
-    env.process(arrival_process(env, teller_pool, stats, lam_per_hour, mu_per_hour, sim_minutes))
-    env.run(until=sim_minutes)
+    ia_sampler = ExpSampler(lam_per_hour, rng)
+    svc_sampler = ExpSampler(mu_per_hour, rng)
+
+    # Main loop: arrivals come in time order and the teller heap already
+    # knows when each service ends, so the classic event list collapses
+    # into one pass over the arrivals — no coroutine per customer.
+    t = ia_sampler.next()
+    while t < sim_minutes:
+        service_time = svc_sampler.next()
+        wait = teller_pool.acquire(t, service_time)
+        start_service = t + wait
+
+        # time spent in line is exactly this customer's slice of queue area
+        stats.area_q += min(wait, sim_minutes - t)
+        if start_service < sim_minutes:
+            stats.record_service_start(wait, service_time)
+        if start_service + service_time <= sim_minutes:
+            stats.record_completion(wait + service_time)
+
+        t += ia_sampler.next()
 
     # Final utilization update
-    dt = env.now - teller_pool._last_change
-    stats.teller_busy_time += teller_pool._busy * dt
+    stats.teller_busy_time = teller_pool.busy_time(sim_minutes)
     stats.total_teller_time = tellers * sim_minutes
 
-    # Calculate metrics
-    avg_wait = statistics.mean(stats.wait_times) if stats.wait_times else 0
-    avg_service = statistics.mean(stats.service_times) if stats.service_times else 0
-    avg_system = statistics.mean(stats.system_times) if stats.system_times else 0
+    # Calculate metrics (trim the preallocated arrays to what was written)
+    waits = stats.wait_times[:stats.n_started]
+    services = stats.service_times[:stats.n_started]
+    systems = stats.system_times[:stats.n_completed]
+    avg_wait = float(np.mean(waits)) if waits.size else 0
+    avg_service = float(np.mean(services)) if services.size else 0
+    avg_system = float(np.mean(systems)) if systems.size else 0
     avg_q_len = stats.area_q / sim_minutes if sim_minutes > 0 else 0
     utilization = stats.teller_busy_time / stats.total_teller_time if stats.total_teller_time > 0 else 0
-    throughput = (len(stats.system_times) / sim_minutes) * 60 if sim_minutes > 0 else 0
+    throughput = (stats.n_completed / sim_minutes) * 60 if sim_minutes > 0 else 0
 
     p95_wait = None
-    if len(stats.wait_times) >= 20:
-        p95_wait = statistics.quantiles(stats.wait_times, n=20)[18]
+    if waits.size >= 20:
+        p95_wait = float(np.percentile(waits, 95))
 
     return {
         "avg_wait_min": avg_wait,
@@ -149,7 +168,7 @@ def run_replication(lam_per_hour=10, mu_per_hour=12, tellers=2, hours=8, seed=No
         "avg_queue_len": avg_q_len,
         "utilization": utilization,
         "throughput_per_hour": throughput,
-        "customers_completed": len(stats.system_times),
+        "customers_completed": stats.n_completed,
         "hours": hours,
         "lam": lam_per_hour,
         "mu": mu_per_hour,
@@ -167,7 +186,7 @@ def run_experiment(lam_per_hour=10, mu_per_hour=12, tellers=2, hours=8, runs=10,
 
     def avg(key):
         vals = [r[key] for r in results if r[key] is not None]
-        return statistics.mean(vals) if vals else 0
+        return float(np.mean(vals)) if vals else 0
 
     summary = {
         "avg_wait_min": avg("avg_wait_min"),
@@ -1,45 +1,75 @@
+import concurrent.futures
+import functools
 import simpy, random, numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # fall back to the plain-Python loop
+    def njit(*args, **kwargs):
+        return lambda f: f
+
 # ----------------------------
 # Helper functions
 # ----------------------------
-def customer(env, name, teller, service_rate, stats):
+class RunStats:
+    """Struct-of-arrays collector: three parallel float arrays written by
+    index, instead of one ~230-byte dict per customer."""
+    def __init__(self, n_upper):
+        self.waits = np.empty(n_upper)
+        self.services = np.empty(n_upper)
+        self.totals = np.empty(n_upper)
+        self.n = 0
+
+    def record(self, wait, service, total):
+        i = self.n
+        if i == self.waits.size:
+            self.waits = np.concatenate([self.waits, np.empty(i)])
+            self.services = np.concatenate([self.services, np.empty(i)])
+            self.totals = np.concatenate([self.totals, np.empty(i)])
+        self.waits[i] = wait
+        self.services[i] = service
+        self.totals[i] = total
+        self.n = i + 1
+
+def customer(env, name, teller, service_rate, stats, rng):
     arrival = env.now
     with teller.request() as req:
         yield req
         wait = env.now - arrival
-        service = random.expovariate(service_rate)
+        service = rng.expovariate(service_rate)
         yield env.timeout(service)
         depart = env.now
-        stats.append({
-            "wait": wait,
-            "service": service,
-            "total": depart - arrival
-        })
-
-def run_simulation(arrival_rate, service_rate, tellers, hours, runs=5):
-    results = []
-    for _ in range(runs):
-        env = simpy.Environment()
-        teller = simpy.Resource(env, capacity=tellers)
-        stats = []
-
-        def arrival_process(env):
-            while True:
-                yield env.timeout(random.expovariate(arrival_rate))
-                env.process(customer(env, f"C{len(stats)+1}", teller, service_rate, stats))
-
-        env.process(arrival_process(env))
-        env.run(until=hours)
-        results.append(stats)
-    return results
+        stats.record(wait, service, depart - arrival)
+
+def run_one_replication(arrival_rate, service_rate, tellers, hours, seed):
+    # own Random instance, so replications never share global RNG state
+    rng = random.Random(seed)
+    env = simpy.Environment()
+    teller = simpy.Resource(env, capacity=tellers)
+    stats = RunStats(int(1.5 * arrival_rate * hours) + 128)
+
+    def arrival_process(env):
+        while True:
+            yield env.timeout(rng.expovariate(arrival_rate))
+            env.process(customer(env, f"C{stats.n+1}", teller, service_rate, stats, rng))
+
+    env.process(arrival_process(env))
+    env.run(until=hours)
+    return stats
+
+def _one_replication(task):
+    # tuple wrapper so the whole sweep flattens into one executor.map
+    return run_one_replication(*task)
+
+def run_simulation(arrival_rate, service_rate, tellers, hours, runs=5, seed_base=42):
+    return [run_one_replication(arrival_rate, service_rate, tellers, hours, seed_base + r)
+            for r in range(runs)]
 
 def summarize(results, tellers):
-    waits = [s["wait"] for run in results for s in run]
-    services = [s["service"] for run in results for s in run]
-    totals = [s["total"] for run in results for s in run]
-    customers = sum(len(run) for run in results)
-    total_time = sum(sum(s["service"] for s in run) for run in results)
+    waits = np.concatenate([r.waits[:r.n] for r in results])
+    totals = np.concatenate([r.totals[:r.n] for r in results])
+    customers = sum(r.n for r in results)
+    total_time = sum(float(r.services[:r.n].sum()) for r in results)
     utilization = (total_time / (3600 * len(results))) / tellers * 100  # %
 
     print(f"\nTellers = {tellers}")
@@ -49,33 +79,70 @@ def summarize(results, tellers):
     print(f"Teller utilization: {utilization:.1f}%")
     print(f"Throughput (cust/hr): {customers/hours/len(results):.2f}")
 
+@njit(cache=True)
+def _mmc_series(lam, mu, c):
+    # build (lam/mu)**n / n! incrementally instead of recomputing
+    # factorials and powers for every n
+    r = lam / mu
+    rho = r / c
+    term = 1.0
+    sum_terms = 1.0
+    for n in range(1, c):
+        term *= r / n
+        sum_terms += term
+    term *= r / c  # now (lam/mu)**c / c!
+    p0 = 1.0 / (sum_terms + term / (1.0 - rho))
+    lq = p0 * term * rho / (1.0 - rho)**2
+    wq = lq / lam * 60.0
+    w = wq + (1.0/mu * 60.0)
+    return rho*100.0, wq, w
+
+@functools.lru_cache(maxsize=None)
+def mmc_metrics(lam, mu, c):
+    rho = lam / (c * mu)
+    if rho >= 1: return None
+    return _mmc_series(float(lam), float(mu), c)
+
+def mmc_metrics_sweep(lam, mu, max_c):
+    """Theoretical M/M/c metrics for every c in 1..max_c in one array pass.
+
+    terms[n] = (lam/mu)**n / n! comes from a single cumprod, and the
+    Erlang-C partial sums from a cumsum, so no per-c Python loop is left.
+    Returns (util_pct, Wq, W) arrays; Wq is inf where the queue is unstable.
+    """
+    r = lam / mu
+    cs = np.arange(1, max_c + 1)
+    terms = np.concatenate(([1.0], np.cumprod(r / cs)))
+    partial = np.cumsum(terms)
+    rho = r / cs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p0 = 1.0 / (partial[cs - 1] + terms[cs] / (1.0 - rho))
+        lq = p0 * terms[cs] * rho / (1.0 - rho) ** 2
+        wq = np.where(rho < 1.0, lq / lam * 60.0, np.inf)
+    w = wq + (1.0 / mu * 60.0)
+    return rho * 100.0, wq, w
+
 # ----------------------------
 # Main experiment
 # ----------------------------
 if __name__ == "__main__":
-    random.seed(42)
     arrival_rate = 10 / 60     # 10 per hour → per minute
     service_rate = 12 / 60     # 12 per hour → per minute
     hours = 8 * 60             # 8-hour day (in minutes)
     runs = 5
 
     print("--- Bank Teller Simulation: Staffing Sweep ---")
-    for tellers in [1, 2, 3, 4]:
-        results = run_simulation(arrival_rate, service_rate, tellers, hours, runs)
-        summarize(results, tellers)
+    # every (tellers, run) pair is independent, so flatten the sweep and
+    # farm it out to all cores; seeds stay deterministic per pair
+    teller_counts = [1, 2, 3, 4]
+    tasks = [(arrival_rate, service_rate, c, hours, 42 + c * runs + r)
+             for c in teller_counts for r in range(runs)]
+    with concurrent.futures.ProcessPoolExecutor() as ex:
+        all_stats = list(ex.map(_one_replication, tasks))
+    for i, tellers in enumerate(teller_counts):
+        summarize(all_stats[i * runs:(i + 1) * runs], tellers)
 
     print("\n--- Validation: M/M/c Theoretical Comparison ---")
-    def mmc_metrics(lam, mu, c):
-        rho = lam / (c * mu)
-        from math import factorial
-        if rho >= 1: return None
-        sum_terms = sum([(lam/mu)**n / factorial(n) for n in range(c)])
-        p0 = 1 / (sum_terms + ((lam/mu)**c / (factorial(c) * (1 - rho))))
-        lq = p0 * ((lam/mu)**c * rho) / (factorial(c) * (1 - rho)**2)
-        wq = lq / lam * 60
-        w = wq + (1/mu * 60)
-        return rho*100, wq, w
-
+    utils, wqs, ws = mmc_metrics_sweep(10, 12, 4)
     for c in [1,2,3,4]:
-        rho, wq, w = mmc_metrics(10, 12, c)
-        print(f"Tellers={c}: Util={rho:.1f}%  Wq={wq:.2f}min  W={w:.2f}min")
+        print(f"Tellers={c}: Util={utils[c-1]:.1f}%  Wq={wqs[c-1]:.2f}min  W={ws[c-1]:.2f}min")
@@ -1,5 +1,6 @@
 import json
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from pathlib import Path
 import csv
 
@@ -20,17 +21,19 @@ def plot_staffing_sweep(exp_names):
         waits.append(data["avg_wait_min"])
         utils.append(data["utilization_pct"])
 
-    plt.figure(figsize=(7, 5))
-    plt.plot(tellers, waits, marker="o", label="Average Wait (min)")
-    plt.plot(tellers, utils, marker="s", label="Teller Utilization (%)")
-    plt.title("Bank Teller Simulation: Staffing Sweep")
-    plt.xlabel("Number of Tellers")
-    plt.ylabel("Performance Metric")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig("results/summary/staffing_sweep.png", dpi=200)
-    plt.show()
+    # Figure + Agg canvas directly: skips the pyplot state machine, GUI
+    # backend probing, and plt.show(), which matter for headless batch runs
+    fig = Figure(figsize=(7, 5), dpi=200)
+    ax = fig.add_subplot(111)
+    ax.plot(tellers, waits, marker="o", label="Average Wait (min)")
+    ax.plot(tellers, utils, marker="s", label="Teller Utilization (%)")
+    ax.set_title("Bank Teller Simulation: Staffing Sweep")
+    ax.set_xlabel("Number of Tellers")
+    ax.set_ylabel("Performance Metric")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    FigureCanvasAgg(fig).print_png("results/summary/staffing_sweep.png")
 
 if __name__ == "__main__":
     # Example: assuming you’ll have results for 1–4 tellers
@@ -1,8 +1,10 @@
 import json
 import csv
+import multiprocessing
+import os
 import time
 from pathlib import Path
-import statistics
+import numpy as np
 from sim_core import BankTellerSim
 
 
@@ -11,9 +13,7 @@ def ensure_dirs():
     Path("results/summary").mkdir(parents=True, exist_ok=True)
 
 
-def run_one(cfg: dict):
-    sim = BankTellerSim(cfg)
-    summary, _ = sim.run()
+def _row_from_summary(summary: dict, cfg: dict) -> dict:
     # flatten parameters we care about into the row
     row = {
         "avg_wait_min": round(summary["avg_wait_min"], 4),
@@ -34,40 +34,71 @@ def run_one(cfg: dict):
     return row
 
 
-def aggregate(rows: list) -> dict:
-    def collect(key):
-        vals = [r[key] for r in rows if r[key] != ""]
-        return vals
+def run_one(cfg: dict):
+    sim = BankTellerSim(cfg)
+    summary, _ = sim.run()
+    return _row_from_summary(summary, cfg)
 
-    def mean_or_zero(vals):
-        return statistics.mean(vals) if vals else 0.0
 
-    agg = {
-        "replications": len(rows),
-        "avg_wait_min": mean_or_zero(collect("avg_wait_min")),
-        "p95_wait_min": statistics.quantiles(collect("avg_wait_min"), n=20)[18] if len(rows) >= 20 else "",
-        "avg_service_min": mean_or_zero(collect("avg_service_min")),
-        "avg_total_min": mean_or_zero(collect("avg_total_min")),
-        "avg_queue_len": mean_or_zero(collect("avg_queue_len")),
-        "utilization_pct": mean_or_zero(collect("utilization_pct")),
-        "throughput_per_hour": mean_or_zero(collect("throughput_per_hour")),
-    }
-    return agg
+# one simulator per worker process, reset between replications so the
+# config parsing and piecewise tables are paid once, not once per rep
+_worker_sim = None
+_worker_cfg = None
 
 
-def save_outputs(experiment_name: str, rows: list, cfg: dict, wall_clock_s: float):
-    # per-replication CSV
-    run_dir = Path(f"results/runs/{experiment_name}")
-    run_dir.mkdir(parents=True, exist_ok=True)
-    runs_csv = run_dir / "runs.csv"
-    if rows:
-        with runs_csv.open("w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-            writer.writeheader()
-            writer.writerows(rows)
-
-    # summary CSV + JSON
-    summary = aggregate(rows)
+def _init_worker(cfg):
+    global _worker_sim, _worker_cfg
+    _worker_cfg = cfg
+    _worker_sim = BankTellerSim(cfg)
+
+
+def run_one_seeded(job):
+    # module-level so it pickles cleanly into worker processes
+    seed, rep = job
+    _worker_sim.reset(seed)
+    summary, _ = _worker_sim.run()
+    cfg = dict(_worker_cfg)
+    cfg["seed"] = seed
+    row = _row_from_summary(summary, cfg)
+    row["rep"] = rep
+    return row
+
+
+class StreamingAggregate:
+    """Running means over replication rows so they never need a second pass.
+
+    Means update incrementally (mean += (x - mean) / n); only the
+    per-replication avg_wait values are retained, for the p95 across reps.
+    """
+    MEAN_KEYS = ["avg_wait_min", "avg_service_min", "avg_total_min",
+                 "avg_queue_len", "utilization_pct", "throughput_per_hour"]
+
+    def __init__(self):
+        self.n = 0
+        self.means = {k: 0.0 for k in self.MEAN_KEYS}
+        self.avg_waits = []
+
+    def add(self, row: dict):
+        self.n += 1
+        for k in self.MEAN_KEYS:
+            self.means[k] += (row[k] - self.means[k]) / self.n
+        self.avg_waits.append(row["avg_wait_min"])
+
+    def summary(self) -> dict:
+        agg = {
+            "replications": self.n,
+            "avg_wait_min": self.means["avg_wait_min"],
+            "p95_wait_min": float(np.percentile(self.avg_waits, 95)) if self.n >= 20 else "",
+            "avg_service_min": self.means["avg_service_min"],
+            "avg_total_min": self.means["avg_total_min"],
+            "avg_queue_len": self.means["avg_queue_len"],
+            "utilization_pct": self.means["utilization_pct"],
+            "throughput_per_hour": self.means["throughput_per_hour"],
+        }
+        return agg
+
+
+def save_summary(experiment_name: str, summary: dict, cfg: dict, wall_clock_s: float):
     summary["parameters"] = cfg
     summary["wall_clock_seconds"] = round(wall_clock_s, 3)
 
@@ -84,7 +115,7 @@ def save_outputs(experiment_name: str, rows: list, cfg: dict, wall_clock_s: floa
     with sum_json_path.open("w") as f:
         json.dump(summary, f, indent=2)
 
-    return runs_csv, sum_csv_path, sum_json_path
+    return sum_csv_path, sum_json_path
 
 
 def main(config_path: str):
@@ -95,17 +126,34 @@ def main(config_path: str):
     seed_base = int(cfg.get("seed_base", 1000))
 
     print(f"Experiment: {name}  |  replications: {reps}")
-    rows = []
+    # build one sim up front so a bad config fails here with a clear
+    # traceback instead of looping inside the pool's worker initializer
+    BankTellerSim(cfg)
+
+    # replications are independent (distinct seeds), so fan them out to all cores
+    jobs = [(seed_base + r, r + 1) for r in range(reps)]
+    run_dir = Path(f"results/runs/{name}")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    runs_csv = run_dir / "runs.csv"
+
+    # stream rows to disk and fold them into the aggregate as they finish,
+    # so peak memory stays flat no matter how many replications run
+    agg = StreamingAggregate()
+    writer = None
     t0 = time.time()
-    for r in range(reps):
-        cfg["seed"] = seed_base + r
-        row = run_one(cfg)
-        row["rep"] = r + 1
-        rows.append(row)
-        print(f"  finished rep {r+1}/{reps}  avg_wait={row['avg_wait_min']} min  util={row['utilization_pct']}%")
+    with runs_csv.open("w", newline="") as f:
+        with multiprocessing.Pool(min(os.cpu_count(), reps),
+                                  initializer=_init_worker, initargs=(cfg,)) as pool:
+            for row in pool.imap_unordered(run_one_seeded, jobs):
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(row.keys()))
+                    writer.writeheader()
+                writer.writerow(row)
+                agg.add(row)
+                print(f"  finished rep {row['rep']}/{reps}  avg_wait={row['avg_wait_min']} min  util={row['utilization_pct']}%")
     elapsed = time.time() - t0
 
-    runs_csv, sum_csv, sum_json = save_outputs(name, rows, cfg, elapsed)
+    sum_csv, sum_json = save_summary(name, agg.summary(), cfg, elapsed)
 
     print("\n--- Summary ---")
     print(f"Saved per-rep CSV:   {runs_csv}")